@@ -0,0 +1,196 @@
+"""Sales-rank and price analytics over tracked product snapshots
+
+A snapshot frame has one row per ASIN per fetch with the columns in
+SNAPSHOT_COLUMNS. The per-ASIN calculations work on the frame sorted by
+(asin, snapshot_time) with plain NumPy array arithmetic instead of
+groupby().apply(), so they stay fast at hundreds of thousands of rows.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_COLUMNS = ['asin', 'category', 'snapshot_time', 'sales_rank', 'price']
+
+# Column names used by the Tab 2 CSV export
+CSV_COLUMNS = {
+    'ASIN': 'asin',
+    'Category': 'category',
+    'Snapshot Time': 'snapshot_time',
+    'Sales Rank': 'sales_rank',
+    'Price Amount': 'price',
+}
+
+NS_PER_DAY = 86400 * 10**9
+
+# Snapshots closer together than this are too noisy to compare ranks across
+MIN_SNAPSHOT_GAP = pd.Timedelta(hours=1)
+
+def snapshots_from_products(products, snapshot_time):
+    """Snapshot rows from extract_product_data() dicts fetched at snapshot_time"""
+    return pd.DataFrame({
+        'asin': [p['asin'] for p in products],
+        'category': [p.get('category', 'N/A') for p in products],
+        'snapshot_time': pd.Timestamp(snapshot_time),
+        'sales_rank': pd.to_numeric([p['sales_rank'] for p in products], errors='coerce'),
+        'price': pd.to_numeric([p['price_amount'] or None for p in products], errors='coerce'),
+    }, columns=SNAPSHOT_COLUMNS)
+
+def read_snapshot_csv(file, name=None):
+    """Snapshot rows from a downloaded analysis CSV
+
+    Older exports have no 'Snapshot Time' column, so the date is taken from
+    the trending_<keyword>_<YYYYMMDD>.csv file name instead (re-downloads
+    like "..._20240101 (1).csv" included). Those snapshots are assumed to be
+    taken at midnight, so velocities against live runs on the same day are
+    skipped or approximate. Rows whose 'Snapshot Time' cannot be parsed are
+    dropped; a file with no usable rows raises ValueError.
+    """
+    df = pd.read_csv(file).rename(columns=CSV_COLUMNS)
+    if 'snapshot_time' not in df:
+        match = re.search(r'_(\d{8})\b', name or getattr(file, 'name', ''))
+        if not match:
+            raise ValueError(f'No snapshot time in {name or file}')
+        df['snapshot_time'] = pd.Timestamp(match.group(1))
+    else:
+        df['snapshot_time'] = pd.to_datetime(df['snapshot_time'], errors='coerce', format='mixed')
+        df = df[df['snapshot_time'].notna()]
+        if df.empty:
+            raise ValueError(f"No readable 'Snapshot Time' values in {name or getattr(file, 'name', file)}")
+    for column in SNAPSHOT_COLUMNS:
+        if column not in df:
+            df[column] = 'N/A' if column == 'category' else np.nan
+    return df[SNAPSHOT_COLUMNS]
+
+def normalize(df):
+    """Coerce dtypes, sort by (asin, snapshot_time) and drop repeated snapshots
+
+    ASINs become a categorical so grouping works on integer codes. Frames
+    that are already typed and sorted skip the sort, so the functions below
+    can be chained cheaply; the value cleanup always runs, and a frame that
+    needs none is returned unchanged.
+    """
+    if not _is_sorted(df):
+        df = df.assign(
+            asin=df['asin'].astype('category'),
+            snapshot_time=pd.to_datetime(df['snapshot_time']),
+            sales_rank=pd.to_numeric(df['sales_rank'], errors='coerce').astype('float64'),
+            price=pd.to_numeric(df['price'], errors='coerce').astype('float64'),
+        )
+        codes = _asin_codes(df)
+        times = _times_ns(df)
+        order = np.lexsort((times, codes))
+        codes, times = codes[order], times[order]
+        # Keep the last of any repeated (asin, snapshot_time) pair
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = (codes[1:] != codes[:-1]) | (times[1:] != times[:-1])
+        df = df.iloc[order[keep]].reset_index(drop=True)
+    return _clean(df)
+
+def _clean(df):
+    """Blank out unreported values: ranks and prices of 0 or less, missing categories"""
+    bad_rank = df['sales_rank'] <= 0
+    bad_price = df['price'] <= 0
+    missing_category = df['category'].isna()
+    if not (bad_rank.any() or bad_price.any() or missing_category.any()):
+        return df
+    return df.assign(
+        sales_rank=df['sales_rank'].mask(bad_rank),
+        price=df['price'].mask(bad_price),
+        category=df['category'].astype(object).fillna('N/A') if missing_category.any() else df['category'],
+    )
+
+def _is_sorted(df):
+    if not isinstance(df['asin'].dtype, pd.CategoricalDtype):
+        return False
+    if df['snapshot_time'].dtype.kind != 'M' or df['sales_rank'].dtype != 'float64' or df['price'].dtype != 'float64':
+        return False
+    codes = _asin_codes(df)
+    times = _times_ns(df)
+    return bool(np.all((codes[1:] > codes[:-1]) | ((codes[1:] == codes[:-1]) & (times[1:] > times[:-1]))))
+
+def _asin_codes(df):
+    return df['asin'].cat.codes.to_numpy()
+
+def _times_ns(df):
+    return df['snapshot_time'].to_numpy().astype('datetime64[ns]').view('int64')
+
+def _group_starts(codes):
+    """Index of the first row of each row's ASIN group in a sorted frame"""
+    is_start = np.ones(len(codes), dtype=bool)
+    is_start[1:] = codes[1:] != codes[:-1]
+    starts = np.flatnonzero(is_start)
+    return np.repeat(starts, np.diff(np.append(starts, len(codes))))
+
+def _previous(values, starts):
+    """Value of the previous row in the same group, NaN for a group's first row"""
+    prev = np.empty_like(values, dtype='float64')
+    prev[0:1] = np.nan
+    prev[1:] = values[:-1]
+    prev[starts == np.arange(len(values))] = np.nan
+    return prev
+
+def _rolling_mean(values, starts, window):
+    """Mean of the non-NaN values among each row's last `window` rows in its group"""
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    end = np.arange(1, len(values) + 1)
+    begin = np.maximum(end - window, starts)
+    total = sums[end] - sums[begin]
+    count = counts[end] - counts[begin]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+def rank_velocity(df, window=3, min_gap=MIN_SNAPSHOT_GAP):
+    """Add rank_velocity: rolling mean of the daily change in log sales rank
+
+    Positive values mean the item is climbing (its rank number is falling).
+    Log ranks make a move from 1,000 to 500 count the same as 100 to 50.
+    Pairs of snapshots less than `min_gap` apart are skipped, since dividing
+    by a tiny gap turns any rank change into a huge daily rate.
+    """
+    df = normalize(df)
+    starts = _group_starts(_asin_codes(df))
+    log_rank = np.log(df['sales_rank'].to_numpy())
+    times = _times_ns(df).astype('float64')
+
+    days = (times - _previous(times, starts)) / NS_PER_DAY
+    min_days = pd.Timedelta(min_gap) / pd.Timedelta(days=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        velocity = np.where((days > 0) & (days >= min_days), (_previous(log_rank, starts) - log_rank) / days, np.nan)
+    return df.assign(rank_velocity=_rolling_mean(velocity, starts, window))
+
+def price_drops(df, threshold=0.10):
+    """Rows where the price fell by at least `threshold` since the ASIN's previous snapshot"""
+    df = normalize(df)
+    starts = _group_starts(_asin_codes(df))
+    price = df['price'].to_numpy()
+    prev = _previous(price, starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drop = (prev - price) / prev
+    mask = drop >= threshold
+    return df[mask].assign(previous_price=prev[mask], drop_pct=drop[mask]).sort_values('drop_pct', ascending=False)
+
+def latest_snapshot(df):
+    """Most recent row for each ASIN of a normalized frame"""
+    codes = _asin_codes(df)
+    is_last = np.ones(len(df), dtype=bool)
+    is_last[:-1] = codes[1:] != codes[:-1]
+    return df[is_last]
+
+def zscore_outliers(df, column='price', threshold=3.0):
+    """Latest snapshot rows whose `column` is at least `threshold` std devs from their category mean"""
+    df = rank_velocity(df) if column == 'rank_velocity' and column not in df else normalize(df)
+    latest = latest_snapshot(df)
+    grouped = latest.groupby('category')[column]
+    mean = grouped.transform('mean')
+    std = grouped.transform('std')
+    z = (latest[column] - mean) / std.where(std > 0)
+    mask = z.abs() >= threshold
+    return latest[mask].assign(zscore=z[mask]).sort_values('zscore', key=np.abs, ascending=False)
+
+def trending(df, window=3, top_n=10, min_gap=MIN_SNAPSHOT_GAP):
+    """ASINs ranked by rank momentum, the latest rolling rank velocity"""
+    latest = latest_snapshot(rank_velocity(df, window, min_gap))
+    return latest.dropna(subset=['rank_velocity']).nlargest(top_n, 'rank_velocity')
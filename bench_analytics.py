@@ -0,0 +1,73 @@
+"""Benchmark analytics.py on synthetic snapshot history
+
+    python bench_analytics.py [--asins 10000] [--snapshots 50]
+
+Generates daily snapshots for a set of ASINs with random-walk sales ranks
+and occasional price cuts, then times each analysis.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import analytics
+
+CATEGORIES = ['Toys', 'Electronics', 'Books', 'Fashion', 'Home']
+
+def synthetic_snapshots(n_asins, n_snapshots, seed=0):
+    rng = np.random.default_rng(seed)
+    asins = np.array([f'B{i:09d}' for i in range(n_asins)])
+    categories = rng.choice(CATEGORIES, n_asins)
+    times = pd.date_range('2024-01-01', periods=n_snapshots, freq='D')
+
+    # Log-normal starting rank, then a multiplicative random walk per ASIN
+    log_rank = np.log(rng.lognormal(10, 1.5, n_asins))[:, None] + np.cumsum(
+        rng.normal(0, 0.1, (n_asins, n_snapshots)), axis=1
+    )
+    base_price = rng.lognormal(3, 0.8, n_asins)[:, None]
+    cuts = np.where(rng.random((n_asins, n_snapshots)) < 0.02, rng.uniform(0.6, 0.95, (n_asins, n_snapshots)), 1.0)
+    price = base_price * np.cumprod(cuts, axis=1)
+
+    df = pd.DataFrame({
+        'asin': np.repeat(asins, n_snapshots),
+        'category': np.repeat(categories, n_snapshots),
+        'snapshot_time': np.tile(times, n_asins),
+        'sales_rank': np.maximum(1, np.exp(log_rank)).round().ravel(),
+        'price': price.round(2).ravel(),
+    })
+    # Snapshots arrive in fetch order, not grouped by ASIN
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+def timed(label, fn, *args, repeat=5, **kwargs):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:<28} {best * 1000:8.1f} ms   {len(result):>8,} rows')
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--asins', type=int, default=10000)
+    parser.add_argument('--snapshots', type=int, default=50)
+    args = parser.parse_args()
+
+    df = synthetic_snapshots(args.asins, args.snapshots)
+    print(f'{len(df):,} rows ({args.asins:,} ASINs x {args.snapshots} snapshots)\n')
+
+    # Normalizing sorts and encodes the raw frame once, the analyses reuse it
+    normalize_time = timed('normalize', analytics.normalize, df)
+    snapshots = analytics.normalize(df)
+    analysis_time = sum([
+        timed('rank_velocity', analytics.rank_velocity, snapshots),
+        timed('price_drops', analytics.price_drops, snapshots),
+        timed('zscore_outliers (price)', analytics.zscore_outliers, snapshots, 'price'),
+        timed('zscore_outliers (velocity)', analytics.zscore_outliers, snapshots, 'rank_velocity'),
+        timed('trending', analytics.trending, snapshots),
+    ])
+    print(f'\n{"total":<28} {(normalize_time + analysis_time) * 1000:8.1f} ms')
+
+if __name__ == '__main__':
+    main()
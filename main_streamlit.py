@@ -2,39 +2,96 @@ import streamlit as st
 import requests
 import hmac
 import hashlib
+from collections.abc import Mapping
 from datetime import datetime
 from urllib.parse import quote
 import json
 import pandas as pd
+import analytics
+from paapi import (
+    AmazonAPIError, ThrottledError, AuthError, APITimeoutError, ServerError, CircuitOpenError,
+    error_from_response, APIResult, CircuitBreaker, Credential, CredentialPool,
+)
+import os
 import time
 
+@st.cache_resource
+def get_circuit_breaker(host):
+    """Shared breaker per host, kept across reruns and sessions"""
+    return CircuitBreaker(host)
+
+def load_credential_pool():
+    """Pool from the [paapi] section of .streamlit/secrets.toml or PAAPI_ACCOUNTS_FILE, if configured
+
+    The config is read on every rerun so a file added later is picked up;
+    the pool itself is cached per config. Raises ValueError for a bad config.
+    """
+    config = None
+    try:
+        if 'paapi' in st.secrets:
+            config = _plain_config(st.secrets['paapi'])
+    except FileNotFoundError as e:
+        # Streamlit raises the same error for a missing and an unparseable secrets.toml
+        if any(os.path.isfile(path) for path in st.get_option('secrets.files')):
+            raise ValueError(f'Could not read secrets: {e}') from e
+    
+    path = os.environ.get('PAAPI_ACCOUNTS_FILE', 'paapi_accounts.json')
+    if config is None and os.path.exists(path):
+        with open(path) as f:
+            try:
+                config = json.load(f)
+            except ValueError as e:
+                raise ValueError(f'{path} is not valid JSON: {e}') from e
+    
+    if config is None:
+        return None
+    if not isinstance(config, Mapping):
+        raise ValueError('Account config must be a table with an accounts list')
+    return _cached_credential_pool(json.dumps(config, sort_keys=True))
+
+def _plain_config(value):
+    """Convert st.secrets sections to plain dicts and lists"""
+    if isinstance(value, Mapping):
+        return {k: _plain_config(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain_config(v) for v in value]
+    return value
+
+@st.cache_resource
+def _cached_credential_pool(config_json):
+    return CredentialPool.from_config(json.loads(config_json))
+
+@st.cache_resource
+def get_single_key_pool(access_key, secret_key, partner_tag):
+    """Pool for credentials typed into the sidebar, kept across reruns"""
+    return CredentialPool([Credential(access_key, secret_key, partner_tag)])
+
 # Amazon Product Advertising API 5.0 Configuration
+# Map marketplace to region and host
+MARKETPLACE_CONFIG = {
+    'www.amazon.com': {'region': 'us-east-1', 'host': 'webservices.amazon.com'},
+    'www.amazon.co.uk': {'region': 'eu-west-1', 'host': 'webservices.amazon.co.uk'},
+    'www.amazon.de': {'region': 'eu-west-1', 'host': 'webservices.amazon.de'},
+    'www.amazon.fr': {'region': 'eu-west-1', 'host': 'webservices.amazon.fr'},
+    'www.amazon.co.jp': {'region': 'us-west-2', 'host': 'webservices.amazon.co.jp'},
+    'www.amazon.ca': {'region': 'us-east-1', 'host': 'webservices.amazon.ca'},
+}
+
 class AmazonAPI:
-    def __init__(self, access_key, secret_key, partner_tag, marketplace='www.amazon.com'):
-        self.access_key = access_key
-        self.secret_key = secret_key
-        self.partner_tag = partner_tag
+    def __init__(self, access_key=None, secret_key=None, partner_tag=None, marketplace='www.amazon.com', pool=None):
+        # A single key is treated as a pool of one
+        self.pool = pool or CredentialPool([Credential(access_key, secret_key, partner_tag)])
         self.marketplace = marketplace
         
-        # Map marketplace to region and host
-        marketplace_config = {
-            'www.amazon.com': {'region': 'us-east-1', 'host': 'webservices.amazon.com'},
-            'www.amazon.co.uk': {'region': 'eu-west-1', 'host': 'webservices.amazon.co.uk'},
-            'www.amazon.de': {'region': 'eu-west-1', 'host': 'webservices.amazon.de'},
-            'www.amazon.fr': {'region': 'eu-west-1', 'host': 'webservices.amazon.fr'},
-            'www.amazon.co.jp': {'region': 'us-west-2', 'host': 'webservices.amazon.co.jp'},
-            'www.amazon.ca': {'region': 'us-east-1', 'host': 'webservices.amazon.ca'},
-        }
-        
-        config = marketplace_config.get(marketplace, marketplace_config['www.amazon.com'])
+        config = MARKETPLACE_CONFIG.get(marketplace, MARKETPLACE_CONFIG['www.amazon.com'])
         self.region = config['region']
         self.host = config['host']
         self.endpoint = f'https://{self.host}/paapi5'
+        self.breaker = get_circuit_breaker(self.host)
         
     def search_items(self, keywords, item_count=10, search_index='All'):
         """Search for products by keywords"""
         payload = {
-            "PartnerTag": self.partner_tag,
             "PartnerType": "Associates",
             "Keywords": keywords,
             "SearchIndex": search_index,
@@ -72,7 +129,6 @@ class AmazonAPI:
     def get_items(self, item_ids):
         """Get detailed info for specific ASINs"""
         payload = {
-            "PartnerTag": self.partner_tag,
             "PartnerType": "Associates",
             "ItemIds": item_ids if isinstance(item_ids, list) else [item_ids],
             "Resources": [
@@ -111,68 +167,105 @@ class AmazonAPI:
         return self._make_request(payload, 'GetItems')
     
     def _make_request(self, payload, operation):
+        """Send the request on the least-loaded pool key, moving to another key if one is throttled
+
+        Returns an APIResult, raises an AmazonAPIError subclass on failure.
+        """
+        for attempt in range(len(self.pool)):
+            # Check the breaker first so a blocked request never waits on or uses up pool capacity
+            self.breaker.before_request()
+            try:
+                credential = self.pool.acquire()
+            except AmazonAPIError:
+                self.breaker.release_trial()
+                raise
+            try:
+                result = self._send(credential, payload, operation)
+            except AmazonAPIError as e:
+                self.pool.release(credential, e)
+                if isinstance(e, (ThrottledError, AuthError)) and attempt + 1 < len(self.pool):
+                    continue
+                raise
+            self.pool.release(credential)
+            return result
+
+    def _send(self, credential, payload, operation):
         """Make signed API request with proper AWS Signature Version 4"""
+        payload_json = json.dumps(dict(payload, PartnerTag=credential.partner_tag))
+        
+        timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+        date_stamp = timestamp[:8]
+        
+        target = f'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.{operation}'
+        
+        # Create canonical request
+        method = 'POST'
+        canonical_uri = f'/paapi5/{operation.lower()}'
+        canonical_querystring = ''
+        
+        payload_hash = hashlib.sha256(payload_json.encode('utf-8')).hexdigest()
+        
+        canonical_headers = f'content-encoding:amz-1.0\ncontent-type:application/json; charset=utf-8\nhost:{self.host}\nx-amz-date:{timestamp}\nx-amz-target:{target}\n'
+        signed_headers = 'content-encoding;content-type;host;x-amz-date;x-amz-target'
+        
+        canonical_request = f'{method}\n{canonical_uri}\n{canonical_querystring}\n{canonical_headers}\n{signed_headers}\n{payload_hash}'
+        
+        # Create string to sign
+        algorithm = 'AWS4-HMAC-SHA256'
+        credential_scope = f'{date_stamp}/{self.region}/ProductAdvertisingAPI/aws4_request'
+        string_to_sign = f'{algorithm}\n{timestamp}\n{credential_scope}\n{hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()}'
+        
+        # Calculate signature with the key's cached signing key
+        k_signing = credential.signing_key(date_stamp, self.region)
+        signature = hmac.new(k_signing, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        
+        authorization_header = f'{algorithm} Credential={credential.access_key}/{credential_scope}, SignedHeaders={signed_headers}, Signature={signature}'
+        
+        headers = {
+            'content-encoding': 'amz-1.0',
+            'content-type': 'application/json; charset=utf-8',
+            'host': self.host,
+            'x-amz-date': timestamp,
+            'x-amz-target': target,
+            'Authorization': authorization_header
+        }
+        
+        url = f'https://{self.host}/paapi5/{operation.lower()}'
+        
         try:
-            payload_json = json.dumps(payload)
-            
-            timestamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
-            date_stamp = datetime.utcnow().strftime('%Y%m%d')
-            
-            target = f'com.amazon.paapi5.v1.ProductAdvertisingAPIv1.{operation}'
-            
-            # Create canonical request
-            method = 'POST'
-            canonical_uri = f'/paapi5/{operation.lower()}'
-            canonical_querystring = ''
-            
-            payload_hash = hashlib.sha256(payload_json.encode('utf-8')).hexdigest()
-            
-            canonical_headers = f'content-encoding:amz-1.0\ncontent-type:application/json; charset=utf-8\nhost:{self.host}\nx-amz-date:{timestamp}\nx-amz-target:{target}\n'
-            signed_headers = 'content-encoding;content-type;host;x-amz-date;x-amz-target'
-            
-            canonical_request = f'{method}\n{canonical_uri}\n{canonical_querystring}\n{canonical_headers}\n{signed_headers}\n{payload_hash}'
-            
-            # Create string to sign
-            algorithm = 'AWS4-HMAC-SHA256'
-            credential_scope = f'{date_stamp}/{self.region}/ProductAdvertisingAPI/aws4_request'
-            string_to_sign = f'{algorithm}\n{timestamp}\n{credential_scope}\n{hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()}'
-            
-            # Calculate signature
-            def sign(key, msg):
-                return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
-            
-            k_date = sign(('AWS4' + self.secret_key).encode('utf-8'), date_stamp)
-            k_region = sign(k_date, self.region)
-            k_service = sign(k_region, 'ProductAdvertisingAPI')
-            k_signing = sign(k_service, 'aws4_request')
-            signature = hmac.new(k_signing, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
-            
-            authorization_header = f'{algorithm} Credential={self.access_key}/{credential_scope}, SignedHeaders={signed_headers}, Signature={signature}'
-            
-            headers = {
-                'content-encoding': 'amz-1.0',
-                'content-type': 'application/json; charset=utf-8',
-                'host': self.host,
-                'x-amz-date': timestamp,
-                'x-amz-target': target,
-                'Authorization': authorization_header
-            }
-            
-            url = f'https://{self.host}/paapi5/{operation.lower()}'
-            
             response = requests.post(url, headers=headers, data=payload_json, timeout=30)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                return {
-                    'error': f'HTTP {response.status_code}',
-                    'message': response.text,
-                    'status_code': response.status_code
-                }
-                
-        except Exception as e:
-            return {'error': 'Unexpected error', 'message': str(e), 'type': type(e).__name__}
+        except requests.Timeout as e:
+            error = APITimeoutError(f'No response from {self.host} within 30s', code='Timeout')
+            self.breaker.record_failure(error)
+            raise error from e
+        except requests.RequestException as e:
+            error = ServerError(str(e), code=type(e).__name__)
+            self.breaker.record_failure(error)
+            raise error from e
+        
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        
+        if response.status_code == 200:
+            if not isinstance(body, dict):
+                error = ServerError(f'Unexpected {operation} response: {response.text[:200]}', status_code=200, code='InvalidResponse')
+                self.breaker.record_failure(error)
+                raise error
+            self.breaker.record_success()
+            return APIResult(operation, body)
+        
+        if body is None:
+            body = {'Errors': [{'Code': None, 'Message': response.text}]}
+        
+        error = error_from_response(response.status_code, body)
+        if isinstance(error, ServerError):
+            self.breaker.record_failure(error)
+        else:
+            # The host answered, so it is healthy even if this request was rejected
+            self.breaker.record_success()
+        raise error
 
 def extract_product_data(item):
     """Extract product data from API response"""
@@ -226,6 +319,10 @@ def extract_product_data(item):
     
     data['sales_rank'] = sales_rank if sales_rank else 'N/A'
     
+    # Category (first browse node)
+    browse_nodes = item.get('BrowseNodeInfo', {}).get('BrowseNodes', [])
+    data['category'] = browse_nodes[0].get('DisplayName', 'N/A') if browse_nodes else 'N/A'
+    
     # Images
     images = item.get('Images', {})
     data['image_url'] = images.get('Primary', {}).get('Large', {}).get('URL', '')
@@ -283,6 +380,28 @@ Check out the link in bio! 🔗
     
     return post
 
+def show_api_error(error, debug=False):
+    """Render an AmazonAPIError with a hint for the failure type"""
+    hints = {
+        ThrottledError: "Request limit reached - wait a moment and try again.",
+        AuthError: "Check your Access Key, Secret Key and Associate Tag.",
+        APITimeoutError: "Amazon did not respond in time.",
+        ServerError: "Amazon's API is having problems in this region.",
+        CircuitOpenError: "Requests to this region are paused after repeated failures.",
+    }
+    st.error(f"❌ Error: {error.label}")
+    st.write("**Message:**", error.message)
+    hint = hints.get(type(error))
+    if hint:
+        st.caption(hint)
+    if debug:
+        st.json(error.to_dict())
+
+def show_partial_errors(result):
+    """Warn about items the API could not return (e.g. invalid ASINs)"""
+    for err in result.errors:
+        st.warning(f"⚠️ {err.code}: {err.message}")
+
 # Streamlit UI
 st.set_page_config(page_title="Amazon Associates API Suite", page_icon="🛍️", layout="wide")
 
@@ -297,17 +416,28 @@ with st.sidebar:
     st.markdown("1. Go to [Amazon Product Advertising API](https://webservices.amazon.com/paapi5/documentation/)")
     st.markdown("2. Sign up and get your credentials")
     
-    access_key = st.text_input("Access Key ID", type="password", help="Your AWS Access Key ID")
-    secret_key = st.text_input("Secret Access Key", type="password", help="Your AWS Secret Access Key")
-    partner_tag = st.text_input("Associate Tag", help="Your Amazon Associate ID (e.g., yourname-20)")
+    # Multiple accounts come from .streamlit/secrets.toml or PAAPI_ACCOUNTS_FILE
+    try:
+        pool = load_credential_pool()
+    except ValueError as e:
+        st.error(f"❌ Account config error: {e}")
+        pool = None
+    if pool:
+        st.info(f"🔑 Using {len(pool)} account(s) from config file")
+    else:
+        access_key = st.text_input("Access Key ID", type="password", help="Your AWS Access Key ID")
+        secret_key = st.text_input("Secret Access Key", type="password", help="Your AWS Secret Access Key")
+        partner_tag = st.text_input("Associate Tag", help="Your Amazon Associate ID (e.g., yourname-20)")
+        if access_key and secret_key and partner_tag:
+            pool = get_single_key_pool(access_key, secret_key, partner_tag)
     
     marketplace = st.selectbox(
         "Marketplace",
         ["www.amazon.com", "www.amazon.co.uk", "www.amazon.de", "www.amazon.fr", "www.amazon.co.jp", "www.amazon.ca"]
     )
     
-    if access_key and secret_key and partner_tag:
-        api = AmazonAPI(access_key, secret_key, partner_tag, marketplace)
+    if pool:
+        api = AmazonAPI(marketplace=marketplace, pool=pool)
         st.success("✅ API Configured")
     else:
         st.warning("⚠️ Enter all API credentials above")
@@ -315,18 +445,36 @@ with st.sidebar:
     
     st.markdown("---")
     debug_mode = st.checkbox("🐛 Debug Mode", help="Show detailed error information")
+    
+    # Circuit breaker status for the selected region
+    breaker_status = get_circuit_breaker(MARKETPLACE_CONFIG[marketplace]['host']).status()
+    if breaker_status['state'] == CircuitBreaker.OPEN:
+        st.error(f"🔴 {breaker_status['host']} unavailable - retrying in {breaker_status['retry_in']:.0f}s")
+    elif breaker_status['state'] == CircuitBreaker.HALF_OPEN:
+        st.warning(f"🟡 {breaker_status['host']} recovering - next request is a trial")
+    else:
+        st.caption(f"🟢 {breaker_status['host']} healthy")
+    if debug_mode:
+        st.json(breaker_status)
+    
+    if pool:
+        with st.expander("📊 Key Utilization"):
+            st.dataframe(pd.DataFrame(pool.stats()), hide_index=True)
+            if pool.has_resting_keys() and st.button("♻️ Re-enable Keys", help="Put disabled or cooling-down keys back into rotation"):
+                pool.reset()
+                st.rerun()
 
 # Test Connection Button
 if api:
     with st.sidebar:
         if st.button("🔌 Test API Connection"):
             with st.spinner("Testing connection..."):
-                test_result = api.search_items("test", 1)
-                
-                if 'error' in test_result:
+                try:
+                    api.search_items("test", 1)
+                except AmazonAPIError as e:
                     st.error("❌ Connection Failed")
                     if debug_mode:
-                        st.json(test_result)
+                        st.json(e.to_dict())
                 else:
                     st.success("✅ Connection Successful!")
 
@@ -355,14 +503,16 @@ with tab1:
     if st.button("🔍 Search Products", key="product_search"):
         if api:
             with st.spinner("Searching..."):
-                results = api.search_items(search_query, result_count, search_index)
-                
-                if debug_mode:
-                    with st.expander("🐛 Debug Info"):
-                        st.json(results)
-                
-                if 'SearchResult' in results:
-                    items = results['SearchResult'].get('Items', [])
+                try:
+                    results = api.search_items(search_query, result_count, search_index)
+                except AmazonAPIError as e:
+                    show_api_error(e, debug_mode)
+                else:
+                    if debug_mode:
+                        with st.expander("🐛 Debug Info"):
+                            st.json(results.data)
+                    
+                    items = results.items
                     st.success(f"✅ Found {len(items)} products")
                     
                     for idx, item in enumerate(items, 1):
@@ -412,10 +562,6 @@ with tab1:
                                         st.write(f"  • {feat}")
                                 
                                 st.markdown(f"[🔗 View on Amazon]({product['url']})")
-                                
-                elif 'error' in results:
-                    st.error(f"❌ Error: {results.get('error', 'Unknown error')}")
-                    st.write("**Message:**", results.get('message', 'No details available'))
         else:
             st.warning("⚠️ Configure API credentials in the sidebar first!")
 # Tab 2: Combined Trending Tracker and Analysis
@@ -429,17 +575,53 @@ with tab2:
     with col2:
         trending_count = st.number_input("Count", 5, 10, 8, key="trend_count")
     
+    history_files = st.file_uploader(
+        "Previous analysis CSVs (optional)",
+        type="csv",
+        accept_multiple_files=True,
+        help="Upload earlier downloads to track rank momentum and price drops over time"
+    )
+    
     if st.button("📈 Analyze Trending Products", key="trending"):
         if api:
             with st.spinner("Fetching and analyzing trending products..."):
-                results = api.search_items(trending_keyword, trending_count)
-                
-                if 'SearchResult' in results:
-                    items = results['SearchResult'].get('Items', [])
+                try:
+                    results = api.search_items(trending_keyword, trending_count)
+                except AmazonAPIError as e:
+                    show_api_error(e, debug_mode)
+                else:
+                    items = results.items
                     
                     if items:
                         products = [extract_product_data(item) for item in items]
                         
+                        # Combine this run with earlier runs and uploaded CSVs. A rerun within
+                        # MIN_SNAPSHOT_GAP replaces the earlier rows for the same ASINs.
+                        snapshot_time = datetime.now().replace(microsecond=0)
+                        current = analytics.snapshots_from_products(products, snapshot_time)
+                        session_rows = st.session_state.get('trend_snapshots')
+                        if session_rows is not None:
+                            replaced = session_rows['asin'].isin(current['asin']) & (
+                                session_rows['snapshot_time'] > snapshot_time - analytics.MIN_SNAPSHOT_GAP
+                            )
+                            current = pd.concat([session_rows[~replaced], current], ignore_index=True)
+                        st.session_state['trend_snapshots'] = current
+                        frames = [current]
+                        for history_file in history_files or []:
+                            try:
+                                frames.append(analytics.read_snapshot_csv(history_file))
+                            except ValueError as e:
+                                st.warning(f"⚠️ Skipped {history_file.name}: {e}")
+                        snapshots = analytics.normalize(pd.concat(frames, ignore_index=True))
+                        snapshot_count = snapshots['snapshot_time'].nunique()
+                        
+                        # Rank trending items by momentum once there is history to compare against
+                        momentum = {}
+                        if snapshot_count > 1:
+                            latest = analytics.latest_snapshot(analytics.rank_velocity(snapshots))
+                            momentum = latest.set_index('asin')['rank_velocity'].dropna().to_dict()
+                            products.sort(key=lambda p: momentum.get(p['asin'], float('-inf')), reverse=True)
+                        
                         # Calculate metrics
                         prices = [p['price_amount'] for p in products if p['price_amount'] > 0]
                         ratings_merchant = [p['merchant_rating'] for p in products if p['merchant_rating']]
@@ -459,6 +641,27 @@ with tab2:
                             amazon_fulfilled = sum(1 for p in products if p['is_amazon_fulfilled'])
                             st.metric("Amazon Fulfilled", f"{amazon_fulfilled}/{len(products)}")
                         
+                        st.markdown("---")
+                        st.subheader("🚀 Rank Momentum & Price Alerts")
+                        
+                        if snapshot_count > 1:
+                            st.caption(f"Based on {len(snapshots):,} rows across {snapshot_count} snapshots. Momentum is the average daily change in log sales rank (log-rank/day); positive means climbing, +0.69 is roughly the rank halving each day.")
+                            
+                            st.write("**Top movers by rank momentum:**")
+                            st.dataframe(analytics.trending(snapshots), hide_index=True)
+                            
+                            drops = analytics.price_drops(snapshots)
+                            st.write(f"**Price drops of 10% or more:** {len(drops)}")
+                            if len(drops):
+                                st.dataframe(drops.sort_values('snapshot_time', ascending=False).head(20), hide_index=True)
+                            
+                            outliers = analytics.zscore_outliers(snapshots, 'price', 2.0)
+                            st.write(f"**Price outliers within category (|z| ≥ 2):** {len(outliers)}")
+                            if len(outliers):
+                                st.dataframe(outliers, hide_index=True)
+                        else:
+                            st.info("Upload previous analysis CSVs or run this again later to track rank momentum and price drops.")
+                        
                         st.markdown("---")
                         st.subheader("📊 Product Comparison with Thumbnails")
                         
@@ -491,9 +694,13 @@ with tab2:
                                 'Rating': rating_display + rating_type,
                                 'Feedback': feedback_display if feedback_display else "No data",
                                 'Sales Rank': product['sales_rank'],
+                                'Momentum': f"{momentum[product['asin']]:+.2f} log-rank/day" if product['asin'] in momentum else "N/A",
                                 'Prime': '✓' if product['is_prime'] else '✗',
                                 'Availability': product['availability'],
-                                'URL': product['url']
+                                'URL': product['url'],
+                                'Category': product['category'],
+                                'Price Amount': product['price_amount'],
+                                'Snapshot Time': snapshot_time.isoformat()
                             })
                         
                         # Display products with thumbnails
@@ -511,7 +718,7 @@ with tab2:
                                 info_cols[0].write(f"💰 {item_data['Price']}")
                                 info_cols[1].write(f"{item_data['Rating']}")
                                 info_cols[2].write(f"📝 {item_data['Feedback']}")
-                                info_cols[3].write(f"📊 Rank: {item_data['Sales Rank']}")
+                                info_cols[3].write(f"📊 Rank: {item_data['Sales Rank']} ({item_data['Momentum']})")
                                 info_cols[4].write(f"Prime: {item_data['Prime']}")
                                 
                                 st.write(f"🏪 Seller: {product['merchant_name']} | [View Product]({item_data['URL']})")
@@ -534,9 +741,6 @@ with tab2:
                         st.success(f"✅ Analysis complete! Found {len(products)} products. Save CSV for daily tracking.")
                     else:
                         st.warning("No items found")
-                elif 'error' in results:
-                    st.error(f"❌ Error: {results.get('error')}")
-                    st.write(results.get('message', 'No details'))
         else:
             st.warning("⚠️ Configure API credentials first!")
 
@@ -551,14 +755,17 @@ with tab3:
         if api and asin_input:
             asins = [a.strip() for a in asin_input.split(',')]
             with st.spinner("Fetching product details..."):
-                results = api.get_items(asins)
-                
-                if debug_mode:
-                    with st.expander("🐛 API Response"):
-                        st.json(results)
-                
-                if 'ItemsResult' in results:
-                    items = results['ItemsResult'].get('Items', [])
+                try:
+                    results = api.get_items(asins)
+                except AmazonAPIError as e:
+                    show_api_error(e, debug_mode)
+                else:
+                    if debug_mode:
+                        with st.expander("🐛 API Response"):
+                            st.json(results.data)
+                    
+                    show_partial_errors(results)
+                    items = results.items
                     
                     if items:
                         for item in items:
@@ -627,9 +834,6 @@ with tab3:
                                 st.markdown(f"### [🛒 Buy Now on Amazon]({product['url']})")
                     else:
                         st.warning("No items found with those ASINs")
-                elif 'error' in results:
-                    st.error(f"❌ Error: {results.get('error')}")
-                    st.write(results.get('message'))
         else:
             st.warning("Enter ASIN(s) and configure API!")
 
@@ -648,10 +852,12 @@ with tab4:
     if st.button("🎨 Generate Posts", key="social"):
         if api:
             with st.spinner("Generating posts..."):
-                results = api.search_items(social_keyword, post_count)
-                
-                if 'SearchResult' in results:
-                    items = results['SearchResult'].get('Items', [])
+                try:
+                    results = api.search_items(social_keyword, post_count)
+                except AmazonAPIError as e:
+                    show_api_error(e, debug_mode)
+                else:
+                    items = results.items
                     
                     if items:
                         for idx, item in enumerate(items, 1):
@@ -690,9 +896,6 @@ with tab4:
                                     st.info(f"💡 **Tip:** Download the image and paste this text into {platform.title()}")
                     else:
                         st.warning("No products found")
-                elif 'error' in results:
-                    st.error(f"❌ Error: {results.get('error')}")
-                    st.write(results.get('message'))
         else:
             st.warning("Configure API credentials first!")
 
@@ -0,0 +1,418 @@
+"""Product Advertising API 5.0 errors, results, circuit breaker and credential pool
+
+Nothing here depends on Streamlit; main_streamlit.py keeps shared
+instances alive across reruns with st.cache_resource.
+"""
+import hashlib
+import hmac
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime
+
+import requests
+
+# API errors
+class AmazonAPIError(Exception):
+    """Base class for failed Product Advertising API requests"""
+    def __init__(self, message, status_code=None, code=None, details=None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.code = code
+        self.details = details
+
+    @property
+    def label(self):
+        return self.code or (f'HTTP {self.status_code}' if self.status_code else type(self).__name__)
+
+    def to_dict(self):
+        return {
+            'error': self.label,
+            'type': type(self).__name__,
+            'message': self.message,
+            'status_code': self.status_code,
+            'details': self.details,
+        }
+
+class ThrottledError(AmazonAPIError):
+    """Request rate or daily quota exceeded (HTTP 429 / TooManyRequests)"""
+
+class AuthError(AmazonAPIError):
+    """Credentials, signature or partner tag rejected"""
+
+class RequestError(AmazonAPIError):
+    """Request rejected as invalid (other 4xx responses)"""
+
+class APITimeoutError(AmazonAPIError):
+    """No response from the host before the timeout"""
+
+class ServerError(AmazonAPIError):
+    """Host unreachable or returned a 5xx response"""
+
+class CircuitOpenError(AmazonAPIError):
+    """Host circuit breaker is open, request was not sent"""
+
+AUTH_ERROR_CODES = {
+    'AccessDenied', 'AccessDeniedException', 'IncompleteSignature', 'InvalidAssociate',
+    'InvalidPartnerTag', 'InvalidSignature', 'MissingAuthenticationToken', 'UnrecognizedClient',
+}
+THROTTLE_ERROR_CODES = {'TooManyRequests', 'RequestThrottled', 'TooManyRequestsException'}
+# Auth failures that retrying with the same key will never fix
+PERMANENT_AUTH_ERROR_CODES = {'InvalidAssociate', 'InvalidPartnerTag', 'UnrecognizedClient', 'UnrecognizedClientException'}
+
+def error_from_response(status_code, body):
+    """Map a non-200 PA-API response to a typed AmazonAPIError"""
+    errors = body.get('Errors', []) if isinstance(body, dict) else []
+    first = errors[0] if errors else {}
+    code = first.get('Code') or (body.get('__type', '').split('#')[-1] if isinstance(body, dict) else '') or None
+    message = first.get('Message') or f'HTTP {status_code}'
+
+    if status_code == 429 or code in THROTTLE_ERROR_CODES:
+        cls = ThrottledError
+    elif status_code in (401, 403) or code in AUTH_ERROR_CODES:
+        cls = AuthError
+    elif status_code >= 500:
+        cls = ServerError
+    else:
+        cls = RequestError
+    return cls(message, status_code=status_code, code=code, details=body)
+
+# API results
+class PartialError:
+    """Per-item error returned alongside a successful response (e.g. invalid ASIN)"""
+    ASIN_PATTERN = re.compile(r'\b([A-Z0-9]{10})\b')
+
+    def __init__(self, code, message):
+        self.code = code
+        self.message = message
+        match = self.ASIN_PATTERN.search(message or '')
+        self.asin = match.group(1) if match else None
+
+    def __repr__(self):
+        return f'PartialError({self.code!r}, asin={self.asin!r})'
+
+class APIResult:
+    """Successful API response with any partial errors split out"""
+    def __init__(self, operation, data):
+        self.operation = operation
+        self.data = data
+        self.errors = [PartialError(e.get('Code'), e.get('Message')) for e in data.get('Errors', [])]
+
+    @property
+    def items(self):
+        result = self.data.get('SearchResult') or self.data.get('ItemsResult') or {}
+        return result.get('Items', [])
+
+    @property
+    def invalid_asins(self):
+        return [e.asin for e in self.errors if e.asin]
+
+# Per-host circuit breaker
+class CircuitBreaker:
+    """Fails fast once a host keeps timing out or erroring, and probes recovery in the background"""
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, host, failure_threshold=3, reset_timeout=30, max_reset_timeout=300, probe_timeout=5):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._trial_in_flight = False
+        self._probe_thread = None
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                # Let a single trial request through
+                self._trial_in_flight = True
+                return
+            if self.state == self.HALF_OPEN:
+                message = f'{self.host} is recovering, recovery trial in progress'
+            else:
+                message = f'{self.host} is unavailable, retrying in {self.retry_in():.0f}s'
+            raise CircuitOpenError(message, code='CircuitOpen', details=self.status())
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.reset_timeout = self.base_reset_timeout
+            self._trial_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def release_trial(self):
+        """Free the half-open trial slot when the trial request was never sent"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        if self._probe_thread is None or not self._probe_thread.is_alive():
+            self._probe_thread = threading.Thread(target=self._probe_loop, name=f'probe-{self.host}', daemon=True)
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        # Wait out the cooldown, then check the host is answering before letting real traffic back
+        while True:
+            with self._lock:
+                if self.state != self.OPEN:
+                    return
+                wait = self.retry_in()
+            time.sleep(wait)
+            healthy = self._probe()
+            with self._lock:
+                if self.state != self.OPEN:
+                    return
+                if healthy:
+                    self.state = self.HALF_OPEN
+                    return
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self.opened_at = time.monotonic()
+
+    def _probe(self):
+        try:
+            response = requests.head(f'https://{self.host}/paapi5', timeout=self.probe_timeout)
+            return response.status_code < 500
+        except requests.RequestException:
+            return False
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def status(self):
+        return {
+            'host': self.host,
+            'state': self.state,
+            'failures': self.failures,
+            'retry_in': round(self.retry_in(), 1) if self.state == self.OPEN else 0,
+            'last_error': self.last_error,
+        }
+
+# Credential pool
+class Credential:
+    """One Associates account with its own rate limits, usage counters and signing-key cache"""
+    def __init__(self, access_key, secret_key, partner_tag, tps=1.0, tpd=8640, name=None):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.partner_tag = partner_tag
+        self.tps = float(tps)
+        self.tpd = int(tpd)
+        if self.tps <= 0 or self.tpd <= 0:
+            raise ValueError(f'tps and tpd must be positive, got tps={tps!r}, tpd={tpd!r}')
+        self.name = name or partner_tag
+        self.capacity = max(1.0, self.tps)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.day = datetime.utcnow().date()
+        self.used_today = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.throttled_until = 0.0
+        self.auth_failed_until = 0.0
+        self.disabled = None
+        self.recent = deque()
+        self._signing_keys = {}
+
+    def signing_key(self, date_stamp, region):
+        """Derive the SigV4 signing key once per day and region"""
+        key = self._signing_keys.get((date_stamp, region))
+        if key is None:
+            def sign(key, msg):
+                return hmac.new(key, msg.encode('utf-8'), hashlib.sha256).digest()
+            
+            k_date = sign(('AWS4' + self.secret_key).encode('utf-8'), date_stamp)
+            k_region = sign(k_date, region)
+            k_service = sign(k_region, 'ProductAdvertisingAPI')
+            key = sign(k_service, 'aws4_request')
+            # Keys for previous days are never used again
+            self._signing_keys = {k: v for k, v in self._signing_keys.items() if k[0] == date_stamp}
+            self._signing_keys[(date_stamp, region)] = key
+        return key
+
+    def refill(self, now):
+        today = datetime.utcnow().date()
+        if today != self.day:
+            self.day = today
+            self.used_today = 0
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.tps)
+        self.last_refill = now
+        while self.recent and now - self.recent[0] > 60:
+            self.recent.popleft()
+
+    def wait_time(self, now):
+        """Seconds until this key may send, None if it is out for the day"""
+        if self.disabled or self.used_today >= self.tpd:
+            return None
+        return max((1 - self.tokens) / self.tps, self.throttled_until - now, self.auth_failed_until - now, 0.0)
+
+    def stats(self):
+        return {
+            'Account': self.name,
+            'Access Key': f'…{self.access_key[-4:]}',
+            'Requests': self.requests,
+            'Throttled': self.throttled,
+            'Throttle Rate': f'{self.throttled / self.requests:.0%}' if self.requests else '0%',
+            'Utilization (60s)': f'{len(self.recent) / (self.tps * 60):.0%}',
+            'Daily Quota': f'{self.used_today:,}/{self.tpd:,}',
+            'Status': self.disabled or (
+                'quota used' if self.used_today >= self.tpd
+                else 'auth cooldown' if self.auth_failed_until > time.monotonic()
+                else 'throttled' if self.throttled_until > time.monotonic()
+                else 'ok'
+            ),
+        }
+
+class CredentialPool:
+    """Schedules requests across several Associates accounts by remaining TPS and daily quota"""
+    ACCOUNT_FIELDS = {'access_key', 'secret_key', 'partner_tag', 'tps', 'tpd', 'name'}
+    REQUIRED_FIELDS = ('access_key', 'secret_key', 'partner_tag')
+    OPTION_FIELDS = ('max_wait', 'throttle_backoff', 'auth_backoff')
+
+    def __init__(self, credentials, max_wait=5.0, throttle_backoff=2.0, auth_backoff=60.0):
+        if not credentials:
+            raise ValueError('CredentialPool needs at least one credential')
+        self.credentials = list(credentials)
+        self.max_wait = _seconds('max_wait', max_wait)
+        self.throttle_backoff = _seconds('throttle_backoff', throttle_backoff)
+        self.auth_backoff = _seconds('auth_backoff', auth_backoff)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.credentials)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a pool from {'accounts': [{'access_key', 'secret_key', 'partner_tag', 'tps', 'tpd', 'name'}, ...]}
+
+        Pool options (max_wait, throttle_backoff, auth_backoff) sit next to
+        'accounts'. Raises ValueError naming the first bad setting or entry.
+        """
+        unknown = set(config) - {'accounts', *cls.OPTION_FIELDS}
+        if unknown:
+            raise ValueError(f"Unknown pool setting(s) {', '.join(sorted(unknown))}")
+        accounts = config.get('accounts')
+        if not accounts or isinstance(accounts, (str, Mapping)):
+            raise ValueError("Account config needs a non-empty 'accounts' list")
+        
+        credentials = []
+        for index, account in enumerate(accounts, 1):
+            if not isinstance(account, Mapping):
+                raise ValueError(f'Account #{index} is not a table of settings')
+            label = f"Account #{index} ({account.get('name') or account.get('partner_tag') or 'unnamed'})"
+            unknown = set(account) - cls.ACCOUNT_FIELDS
+            if unknown:
+                raise ValueError(f"{label}: unknown setting(s) {', '.join(sorted(unknown))}")
+            missing = [field for field in cls.REQUIRED_FIELDS if not account.get(field)]
+            if missing:
+                raise ValueError(f"{label}: missing {', '.join(missing)}")
+            try:
+                credentials.append(Credential(**account))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f'{label}: {e}') from e
+        
+        options = {k: config[k] for k in cls.OPTION_FIELDS if k in config}
+        return cls(credentials, **options)
+
+    def acquire(self):
+        """Reserve a request slot on the key with the most headroom, waiting up to max_wait"""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                waits = {}
+                for credential in self.credentials:
+                    credential.refill(now)
+                    wait = credential.wait_time(now)
+                    if wait is not None:
+                        waits[id(credential)] = wait
+                
+                ready = [c for c in self.credentials if waits.get(id(c)) == 0]
+                if ready:
+                    # Prefer spare TPS, then spare daily quota
+                    credential = max(ready, key=lambda c: (c.tokens / c.capacity, 1 - c.used_today / c.tpd))
+                    credential.tokens -= 1
+                    credential.used_today += 1
+                    credential.requests += 1
+                    credential.recent.append(now)
+                    return credential
+                
+                if not waits:
+                    if all(c.disabled for c in self.credentials):
+                        raise AuthError('All credentials in the pool were rejected', code='NoValidCredentials')
+                    raise ThrottledError('Daily request quota used up on every key', code='QuotaExhausted')
+                wait = min(waits.values())
+            
+            if now + wait > deadline:
+                if all(c.disabled or c.auth_failed_until > now for c in self.credentials):
+                    raise AuthError(f'Every key was rejected recently, next retry in {wait:.0f}s', code='CredentialsCoolingDown')
+                raise ThrottledError(f'All keys busy or cooling down, next slot in {wait:.1f}s', code='PoolExhausted')
+            time.sleep(wait)
+
+    def release(self, credential, error=None):
+        """Record the outcome of a request sent with credential"""
+        with self._lock:
+            if isinstance(error, ThrottledError):
+                credential.throttled += 1
+                credential.throttled_until = time.monotonic() + self.throttle_backoff
+            elif isinstance(error, AuthError):
+                credential.errors += 1
+                if error.code in PERMANENT_AUTH_ERROR_CODES:
+                    credential.disabled = f'auth failed: {error.label}'
+                else:
+                    # Signature and clock errors can clear up, so only rest the key
+                    credential.auth_failed_until = time.monotonic() + self.auth_backoff
+            elif error is not None:
+                credential.errors += 1
+
+    def reset(self):
+        """Put disabled and cooling-down keys back into rotation"""
+        with self._lock:
+            for credential in self.credentials:
+                credential.disabled = None
+                credential.auth_failed_until = 0.0
+                credential.throttled_until = 0.0
+
+    def has_resting_keys(self):
+        now = time.monotonic()
+        return any(c.disabled or c.auth_failed_until > now for c in self.credentials)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            for credential in self.credentials:
+                credential.refill(now)
+            return [credential.stats() for credential in self.credentials]
+
+def _seconds(name, value):
+    """Validate a pool option given in seconds"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f'{name} must be a non-negative number of seconds, got {value!r}')
+    return float(value)
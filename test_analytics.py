@@ -0,0 +1,109 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from bench_analytics import synthetic_snapshots
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=analytics.SNAPSHOT_COLUMNS)
+
+def test_rank_velocity_matches_groupby_reference():
+    df = synthetic_snapshots(200, 15, seed=3)
+    df.loc[df.sample(150, random_state=1).index, 'sales_rank'] = np.nan
+    result = analytics.rank_velocity(df, window=3)
+
+    ref = df.sort_values(['asin', 'snapshot_time']).reset_index(drop=True)
+    grouped = ref.groupby('asin')
+    days = grouped['snapshot_time'].diff() / pd.Timedelta(days=1)
+    ref['velocity'] = -grouped['sales_rank'].transform(lambda s: np.log(s).diff()) / days
+    expected = ref.groupby('asin')['velocity'].transform(lambda s: s.rolling(3, min_periods=1).mean())
+
+    assert np.allclose(result['rank_velocity'].to_numpy(), expected.to_numpy(), equal_nan=True)
+
+def test_rank_velocity_skips_snapshots_closer_than_min_gap():
+    df = frame([
+        ('A', 'Toys', '2024-01-01 00:00:00', 100, 10.0),
+        ('A', 'Toys', '2024-01-02 00:00:00', 50, 10.0),
+        ('A', 'Toys', '2024-01-02 00:00:30', 10, 10.0),
+    ])
+    velocity = analytics.rank_velocity(df, window=1)['rank_velocity'].to_numpy()
+
+    assert np.isnan(velocity[0])
+    assert np.isclose(velocity[1], np.log(2))
+    assert np.isnan(velocity[2])
+
+def test_price_drops_compares_with_previous_snapshot_of_same_asin():
+    df = frame([
+        ('A', 'Toys', '2024-01-01', 100, 20.0),
+        ('A', 'Toys', '2024-01-02', 100, 15.0),
+        ('A', 'Toys', '2024-01-03', 100, 14.0),
+        ('B', 'Toys', '2024-01-01', 100, 30.0),
+        ('C', 'Toys', '2024-01-02', 100, 5.0),
+    ])
+    drops = analytics.price_drops(df, threshold=0.10)
+
+    assert list(drops['asin']) == ['A']
+    assert drops['previous_price'].iloc[0] == 20.0
+    assert np.isclose(drops['drop_pct'].iloc[0], 0.25)
+
+def test_zscore_outliers_ignores_categories_with_zero_std():
+    rows = [(f'F{i}', 'Flat', '2024-01-01', 100, 10.0) for i in range(5)]
+    rows += [(f'S{i}', 'Spread', '2024-01-01', 100, 10.0) for i in range(9)]
+    rows.append(('S9', 'Spread', '2024-01-01', 100, 100.0))
+    outliers = analytics.zscore_outliers(frame(rows), 'price', threshold=2.0)
+
+    assert list(outliers['asin']) == ['S9']
+
+def test_normalize_keeps_last_of_repeated_snapshots():
+    df = frame([
+        ('B', 'Toys', '2024-01-02', 5, 1.0),
+        ('A', 'Toys', '2024-01-01', 10, 2.0),
+        ('A', 'Toys', '2024-01-01', 20, 3.0),
+        ('A', 'Toys', '2024-01-02', 0, 0.0),
+    ])
+    result = analytics.normalize(df)
+
+    assert list(result['asin']) == ['A', 'A', 'B']
+    assert result['sales_rank'].iloc[0] == 20
+    assert np.isnan(result['sales_rank'].iloc[1]) and np.isnan(result['price'].iloc[1])
+    assert analytics.normalize(result) is result
+
+def test_read_snapshot_csv_takes_date_from_redownloaded_file_name():
+    csv = io.StringIO('ASIN,Sales Rank,Price Amount\nB000000001,123,9.99\n')
+    df = analytics.read_snapshot_csv(csv, name='trending_gadgets_20240105 (1).csv')
+
+    assert df['snapshot_time'].iloc[0] == pd.Timestamp('2024-01-05')
+
+def test_read_snapshot_csv_drops_rows_with_unreadable_snapshot_time():
+    csv = io.StringIO(
+        'ASIN,Snapshot Time,Sales Rank,Price Amount\n'
+        'B000000001,2024-01-05T10:00:00,123,9.99\n'
+        'B000000002,garbage,456,5.00\n'
+    )
+    df = analytics.read_snapshot_csv(csv)
+
+    assert list(df['asin']) == ['B000000001']
+    assert analytics.normalize(df)['snapshot_time'].iloc[0] == pd.Timestamp('2024-01-05 10:00')
+
+def test_read_snapshot_csv_rejects_file_without_readable_snapshot_time():
+    csv = io.StringIO('ASIN,Snapshot Time,Sales Rank\nB000000001,garbage,123\n')
+
+    with pytest.raises(ValueError, match='Snapshot Time'):
+        analytics.read_snapshot_csv(csv, name='broken.csv')
+
+def test_normalize_cleans_values_of_presorted_frames():
+    df = frame([
+        ('A', None, '2024-01-01', 100, 10.0),
+        ('A', 'Toys', '2024-01-02', 0, 10.0),
+        ('B', 'Toys', '2024-01-02', 100, 10.0),
+    ]).assign(asin=lambda d: d['asin'].astype('category'), snapshot_time=lambda d: pd.to_datetime(d['snapshot_time']))
+    df['sales_rank'] = df['sales_rank'].astype('float64')
+
+    result = analytics.normalize(df)
+    assert np.isnan(result['sales_rank'].iloc[1])
+    assert result['category'].iloc[0] == 'N/A'
+    assert not np.isinf(analytics.rank_velocity(df)['rank_velocity']).any()
+    assert list(analytics.trending(df)['asin']) == []
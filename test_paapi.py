@@ -0,0 +1,222 @@
+import time
+
+import pytest
+
+import paapi
+from paapi import CircuitBreaker, CircuitOpenError
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+@pytest.mark.parametrize('status, body, cls, label', [
+    (429, {}, paapi.ThrottledError, 'HTTP 429'),
+    (400, {'Errors': [{'Code': 'TooManyRequests', 'Message': 'slow down'}]}, paapi.ThrottledError, 'TooManyRequests'),
+    (401, {'__type': 'com.amazon.paapi5#UnrecognizedClientException'}, paapi.AuthError, 'UnrecognizedClientException'),
+    (400, {'Errors': [{'Code': 'InvalidPartnerTag', 'Message': 'bad tag'}]}, paapi.AuthError, 'InvalidPartnerTag'),
+    (400, {'Errors': [{'Code': 'InvalidParameterValue', 'Message': 'bad'}]}, paapi.RequestError, 'InvalidParameterValue'),
+    (503, {}, paapi.ServerError, 'HTTP 503'),
+    (500, 'not a dict', paapi.ServerError, 'HTTP 500'),
+])
+def test_error_from_response_maps_status_and_code(status, body, cls, label):
+    error = paapi.error_from_response(status, body)
+
+    assert type(error) is cls
+    assert error.label == label
+    assert error.status_code == status
+
+def test_api_result_splits_out_invalid_asins():
+    result = paapi.APIResult('GetItems', {
+        'ItemsResult': {'Items': [{'ASIN': 'B000000001'}]},
+        'Errors': [{'Code': 'InvalidParameterValue', 'Message': 'The ItemId B0BADBADBA provided in the request is invalid.'}],
+    })
+
+    assert [item['ASIN'] for item in result.items] == ['B000000001']
+    assert result.invalid_asins == ['B0BADBADBA']
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker('example.invalid', failure_threshold=3, reset_timeout=0.02, max_reset_timeout=1)
+    breaker.probe_results = []
+    monkeypatch.setattr(breaker, '_probe', lambda: breaker.probe_results.pop(0) if breaker.probe_results else True)
+    return breaker
+
+def test_breaker_opens_at_threshold_and_fails_fast(breaker):
+    breaker.probe_results = [False] * 100
+    for _ in range(2):
+        breaker.record_failure('timeout')
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+    breaker.record_failure('timeout')
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError, match='unavailable'):
+        breaker.before_request()
+
+def test_breaker_success_resets_failure_count(breaker):
+    breaker.record_failure('timeout')
+    breaker.record_failure('timeout')
+    breaker.record_success()
+    breaker.record_failure('timeout')
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_breaker_half_opens_after_good_probe_and_allows_one_trial(breaker):
+    for _ in range(3):
+        breaker.record_failure('timeout')
+    wait_for(lambda: breaker.state == CircuitBreaker.HALF_OPEN)
+
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError, match='recovery trial in progress'):
+        breaker.before_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_request()
+
+def test_breaker_stays_open_while_probes_fail(breaker):
+    breaker.probe_results = [False] * 100
+    for _ in range(3):
+        breaker.record_failure('timeout')
+    wait_for(lambda: len(breaker.probe_results) <= 98)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.reset_timeout >= 0.08
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+def test_breaker_failed_trial_reopens_with_doubled_timeout(breaker):
+    for _ in range(3):
+        breaker.record_failure('timeout')
+    wait_for(lambda: breaker.state == CircuitBreaker.HALF_OPEN)
+    breaker.probe_results = [False] * 100
+
+    breaker.before_request()
+    breaker.record_failure('timeout')
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.reset_timeout == pytest.approx(0.04)
+
+def test_breaker_release_trial_frees_the_trial_slot(breaker):
+    for _ in range(3):
+        breaker.record_failure('timeout')
+    wait_for(lambda: breaker.state == CircuitBreaker.HALF_OPEN)
+
+    breaker.before_request()
+    breaker.release_trial()
+    breaker.before_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def make_pool(*credentials, **options):
+    return paapi.CredentialPool(list(credentials), **options)
+
+def key(name, **kwargs):
+    return paapi.Credential(f'AK{name}xxxx', f'secret-{name}', f'{name}-20', name=name, **kwargs)
+
+def test_pool_prefers_key_with_spare_tps_then_daily_quota():
+    busy, spare = key('busy'), key('spare')
+    busy.tokens = 0.5
+    assert make_pool(busy, spare).acquire() is spare
+
+    used, fresh = key('used'), key('fresh')
+    used.used_today = 100
+    assert make_pool(used, fresh).acquire() is fresh
+
+def test_pool_acquire_counts_the_request():
+    credential = key('a')
+    pool = make_pool(credential)
+    pool.acquire()
+
+    assert credential.requests == 1
+    assert credential.used_today == 1
+    assert pool.stats()[0]['Daily Quota'] == '1/8,640'
+
+def test_throttled_key_backs_off():
+    first, second = key('first', tps=5), key('second', tps=5)
+    pool = make_pool(first, second, throttle_backoff=60)
+    pool.release(first, paapi.ThrottledError('slow down'))
+
+    assert [pool.acquire() for _ in range(3)] == [second] * 3
+    stats = pool.stats()[0]
+    assert stats['Throttled'] == 1
+    assert stats['Status'] == 'throttled'
+
+def test_permanent_auth_error_disables_key_until_reset():
+    credential = key('a')
+    pool = make_pool(credential)
+    pool.release(credential, paapi.AuthError('bad tag', code='InvalidPartnerTag'))
+
+    assert credential.disabled
+    with pytest.raises(paapi.AuthError) as info:
+        pool.acquire()
+    assert info.value.code == 'NoValidCredentials'
+
+    pool.reset()
+    assert pool.acquire() is credential
+
+def test_transient_auth_error_only_rests_key():
+    flaky, good = key('flaky'), key('good')
+    pool = make_pool(flaky, good, auth_backoff=60, max_wait=0)
+    pool.release(flaky, paapi.AuthError('clock skew', code='InvalidSignature'))
+
+    assert flaky.disabled is None
+    assert pool.has_resting_keys()
+    assert pool.acquire() is good
+    assert pool.stats()[0]['Status'] == 'auth cooldown'
+
+    pool.release(good, paapi.AuthError('clock skew', code='IncompleteSignature'))
+    with pytest.raises(paapi.AuthError) as info:
+        pool.acquire()
+    assert info.value.code == 'CredentialsCoolingDown'
+
+def test_pool_raises_quota_exhausted_when_daily_quota_used_up():
+    pool = make_pool(key('a', tps=10, tpd=1))
+    pool.acquire()
+
+    with pytest.raises(paapi.ThrottledError) as info:
+        pool.acquire()
+    assert info.value.code == 'QuotaExhausted'
+
+def test_pool_raises_pool_exhausted_instead_of_waiting_past_max_wait():
+    pool = make_pool(key('a', tps=1), max_wait=0)
+    pool.acquire()
+
+    with pytest.raises(paapi.ThrottledError) as info:
+        pool.acquire()
+    assert info.value.code == 'PoolExhausted'
+
+def test_signing_keys_are_cached_per_credential():
+    a, b = key('a'), key('b')
+
+    assert a.signing_key('20240101', 'us-east-1') is a.signing_key('20240101', 'us-east-1')
+    assert a.signing_key('20240101', 'us-east-1') != b.signing_key('20240101', 'us-east-1')
+
+ACCOUNT = {'access_key': 'AK', 'secret_key': 'SK', 'partner_tag': 'tag-20'}
+
+def test_from_config_builds_pool_with_options():
+    pool = paapi.CredentialPool.from_config({
+        'accounts': [dict(ACCOUNT, tps=2, tpd=100), dict(ACCOUNT, name='second')],
+        'max_wait': 1,
+    })
+
+    assert len(pool) == 2
+    assert pool.credentials[0].tps == 2.0
+    assert pool.max_wait == 1.0
+
+@pytest.mark.parametrize('config, message', [
+    ({}, "non-empty 'accounts' list"),
+    ({'accounts': ['oops']}, 'Account #1 is not a table'),
+    ({'accounts': [{'access_key': 'AK', 'secret_key': 'SK'}]}, 'missing partner_tag'),
+    ({'accounts': [dict(ACCOUNT, tsp=1)]}, 'unknown setting.*tsp'),
+    ({'accounts': [dict(ACCOUNT, tps=0)]}, 'Account #1 \\(tag-20\\): tps and tpd must be positive'),
+    ({'accounts': [dict(ACCOUNT, tpd='lots')]}, 'Account #1'),
+    ({'accounts': [ACCOUNT], 'max_wiat': 5}, 'Unknown pool setting.*max_wiat'),
+    ({'accounts': [ACCOUNT], 'max_wait': '5'}, 'max_wait must be'),
+    ({'accounts': [ACCOUNT], 'auth_backoff': -1}, 'auth_backoff must be'),
+    ({'accounts': [ACCOUNT], 'throttle_backoff': True}, 'throttle_backoff must be'),
+])
+def test_from_config_rejects_bad_config(config, message):
+    with pytest.raises(ValueError, match=message):
+        paapi.CredentialPool.from_config(config)